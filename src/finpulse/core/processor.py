@@ -1,145 +1,256 @@
 """Core data processing logic."""
 
+import io
 import logging
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
 
 from ..data.csv_reader import load_inputs_by_file
 from ..data.normalizer import normalize
 from ..excel.sheet_inserter import insert_into_account_sheet, insert_into_details
+from ..utils.logging_utils import LOG_FORMAT
 
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
-def process_source(src_name: str, scfg: dict, xlsx: Path, details_sheet: str, args, cumulative_keys: dict = None) -> Tuple[int, int, int, int, int, dict]:
-    """Process a single data source by processing each CSV file individually."""
-    print(f"\n=== Source: {src_name} ===")
-    csv_frames = load_inputs_by_file(scfg)
-    
-    if not csv_frames:
-        # Still count existing records even if no new data to ingest
-        account_sheet = scfg.get("account_sheet")
-        if account_sheet and xlsx.exists():
-            try:
-                wb = load_workbook(xlsx, read_only=True)
-                if account_sheet in wb.sheetnames:
-                    ws = wb[account_sheet]
-                    # Count non-empty rows (skip header)
-                    existing_count = 0
-                    for row_idx in range(2, ws.max_row + 1):
-                        # Check if row has any data
-                        has_data = False
-                        for col_idx in range(1, min(ws.max_column + 1, 15)):  # Check first 15 columns
-                            if ws.cell(row=row_idx, column=col_idx).value:
-                                has_data = True
-                                break
-                        if has_data:
-                            existing_count += 1
-                    wb.close()
-                    print(f"  -> no new data, but found {existing_count} existing records")
-                    return 0, 0, 0, 0, existing_count, {}
-                wb.close()
-            except Exception as e:
-                logging.warning(f"Failed to count existing records for {src_name}: {e}")
-        return 0, 0, 0, 0, 0, {}
-    
-    print(f"  total CSV files: {len(csv_frames)}")
-    print(f"  total rows across all files: {sum(len(df) for df in csv_frames)}")
 
-    
+def resolve_raw_map(src_name: str, scfg: dict, xlsx: Union[Path, Workbook]) -> Optional[dict]:
+    """Resolve the raw column map for a source, reading K+ headers from the sheet if configured.
+
+    xlsx may be a path or an already-open Workbook, which is read as is and left open.
+    """
     account_sheet = scfg.get("account_sheet")
     raw_map = scfg.get("raw_map")
-    bank_label = scfg.get("bank_label", src_name)
-    account_label = scfg.get("account_label", src_name)
-    
-    # Get raw_map once for all files
+
     if scfg.get("auto_raw_from_sheet", False):
         try:
-            if not xlsx.exists():
+            owned = not isinstance(xlsx, Workbook)
+            if owned and not xlsx.exists():
                 print(f"  Warning: Workbook {xlsx} does not exist, skipping auto_raw_from_sheet")
                 raw_map = {}
             else:
-                wb = load_workbook(xlsx, read_only=True, data_only=False)
+                wb = load_workbook(xlsx, read_only=True, data_only=False) if owned else xlsx
                 if account_sheet not in wb.sheetnames:
-                    wb.close()
+                    if owned:
+                        wb.close()
                     print(f"  Warning: Account sheet '{account_sheet}' not found, skipping auto_raw_from_sheet")
                     raw_map = {}
                 else:
                     ws = wb[account_sheet]
-                    raw_map = {}
-                    for c in range(11, ws.max_column + 1):
-                        name = ws.cell(row=1, column=c).value
-                        if isinstance(name, str) and name.strip():
-                            raw_map[name.strip()] = name.strip()
-                    wb.close()
+                    # Read the K+ header cells in one pass rather than one ws.cell() lookup per column
+                    header = next(ws.iter_rows(min_row=1, max_row=1, min_col=11, max_col=ws.max_column,
+                                               values_only=True), ())
+                    raw_map = {n.strip(): n.strip() for n in header if isinstance(n, str) and n.strip()}
+                    if owned:
+                        wb.close()
         except (FileNotFoundError, PermissionError, KeyError) as e:
-            logging.warning(f"Failed to load workbook for auto_raw_from_sheet: {e}")
+            logging.warning(f"Failed to load workbook for auto_raw_from_sheet ({src_name}): {e}")
             raw_map = {}
-    
-    print(f"  raw_map keys (K+ headers): {list(raw_map.keys()) if raw_map else 'None'}")
-    
-    # Process each CSV file individually
+
+    return raw_map
+
+
+@contextmanager
+def _capture_output(buf: io.StringIO, log_level: int):
+    """Route stdout and log records into buf, e.g. inside a worker process.
+
+    This module's records keep the bare console format; root-logger records (warnings from
+    the CSV reader, date parsing, ...) replace the root handlers and keep the LOG_FORMAT.
+    """
+    handler = logging.StreamHandler(buf)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    root_handler = logging.StreamHandler(buf)
+    root_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    prev_level, prev_propagate = logger.level, logger.propagate
+    prev_root_level, prev_root_handlers = root.level, root.handlers[:]
+    logger.addHandler(handler)
+    logger.setLevel(log_level)
+    logger.propagate = False
+    root.handlers = [root_handler]
+    root.setLevel(log_level)
+    try:
+        with redirect_stdout(buf):
+            yield
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(prev_level)
+        logger.propagate = prev_propagate
+        root.handlers = prev_root_handlers
+        root.setLevel(prev_root_level)
+
+
+def prepare_rows(src_name: str, scfg: dict, start_date=None, end_date=None,
+                 log_level: int = logging.INFO) -> Tuple[str, List[Tuple[str, list, int, pd.DataFrame]], str, bool]:
+    """Read, normalize and date-filter every CSV of a source without touching the workbook.
+
+    Runs in a worker process, so it only takes and returns picklable values. Console
+    output and log records (at log_level) are captured and handed back so the caller
+    can print them in source order. Each batch carries the in-range CSV rows so the raw
+    column payload can be attached once the raw map is known (see attach_raw_payload).
+
+    Returns (src_name, [(source_file, rows, nat_count, raw_df), ...], captured_output,
+    no_csv_files), where no_csv_files tells "no input at all" apart from "every row filtered out".
+    """
+    buf = io.StringIO()
+    batches = []
+    with _capture_output(buf, log_level):
+        print(f"\n=== Source: {src_name} ===")
+        csv_frames = load_inputs_by_file(scfg)
+
+        if csv_frames:
+            logger.debug("  total CSV files: %d", len(csv_frames))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  total rows across all files: %d", sum(len(df) for df in csv_frames))
+
+        for file_idx, df_in in enumerate(csv_frames, 1):
+            source_file = df_in["__source_file"].iloc[0] if not df_in.empty else "unknown"
+            print(f"\n  Processing file {file_idx}/{len(csv_frames)}: {Path(source_file).name}")
+            logger.debug("    rows in file: %d", len(df_in))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("    CSV headers: %s", list(df_in.columns))
+
+            norm_df = normalize(df_in, scfg)
+            logger.debug("    normalized rows: %d", len(norm_df))
+
+            try:
+                dates = pd.to_datetime(norm_df["date"], errors="coerce")
+                nat_count = int(dates.isna().sum())
+                logger.debug("    date dtype: %s, NaT count: %d of %d", dates.dtype, nat_count, len(dates))
+                if logger.isEnabledFor(logging.DEBUG) and dates.notna().any():
+                    logger.debug("    date min/max: %s .. %s", dates.min(), dates.max())
+                norm_df["date"] = dates
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Failed to process dates for file {source_file}: {e}")
+                print(f"    Warning: Date processing failed, skipping file")
+                continue
+
+            if start_date or end_date:
+                # Compare on raw datetime64 values; NaT compares False and is dropped as before
+                dates_np = norm_df["date"].to_numpy().astype("datetime64[ns]", copy=False)
+                mask = np.ones(len(dates_np), dtype=bool)
+                if start_date:
+                    mask &= dates_np >= pd.to_datetime(start_date).to_datetime64()
+                if end_date:
+                    mask &= dates_np <= pd.to_datetime(end_date).to_datetime64()
+                norm_df = norm_df.iloc[mask]
+
+            print(f"    rows after date filter: {len(norm_df)}")
+            if norm_df.empty:
+                continue
+
+            # Resolve every column to a positional array once instead of per-row label lookups
+            amounts = pd.to_numeric(norm_df["amount"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64).tolist()
+            dates_list = norm_df["date"].tolist()
+            descriptions = norm_df["description"].tolist()
+            auto_cats = (norm_df["automated_trans_category"].tolist()
+                         if "automated_trans_category" in norm_df.columns else None)
+
+            rows = []
+            for i in range(len(norm_df)):
+                row_data = {
+                    "date": dates_list[i],
+                    "amount": amounts[i],
+                    "description": descriptions[i],
+                }
+
+                # Add automated transaction category if available
+                if auto_cats is not None:
+                    row_data["automated_trans_category"] = auto_cats[i]
+
+                rows.append(row_data)
+
+            raw_df = df_in.iloc[df_in.index.get_indexer(norm_df.index)]
+            batches.append((source_file, rows, nat_count, raw_df))
+
+    return src_name, batches, buf.getvalue(), not csv_frames
+
+
+def attach_raw_payload(rows: list, raw_df: pd.DataFrame, raw_map: Optional[dict]) -> None:
+    """Set each row's "__raw__" payload from the matching raw_df row, limited to raw_map's CSV columns."""
+    # Keep only mapped columns present in the CSV; absent ones read back as None via .get() anyway
+    needed = [c for c in dict.fromkeys(raw_map.values()) if c in raw_df.columns] if raw_map else []
+    arrays = [raw_df[c].to_numpy() for c in needed]
+    for i, row_data in enumerate(rows):
+        row_data["__raw__"] = {csv_col: arr[i] for csv_col, arr in zip(needed, arrays)}
+
+
+def count_existing_records(src_name: str, scfg: dict, xlsx: Union[Path, Workbook]) -> int:
+    """Count non-empty rows already present in a source's account sheet (xlsx may be an open Workbook)."""
+    account_sheet = scfg.get("account_sheet")
+    owned = not isinstance(xlsx, Workbook)
+    if account_sheet and (not owned or xlsx.exists()):
+        try:
+            wb = load_workbook(xlsx, read_only=True) if owned else xlsx
+            if account_sheet in wb.sheetnames:
+                ws = wb[account_sheet]
+                # Count non-empty rows (skip header)
+                existing_count = 0
+                for row_idx in range(2, ws.max_row + 1):
+                    # Check if row has any data
+                    has_data = False
+                    for col_idx in range(1, min(ws.max_column + 1, 15)):  # Check first 15 columns
+                        if ws.cell(row=row_idx, column=col_idx).value:
+                            has_data = True
+                            break
+                    if has_data:
+                        existing_count += 1
+                if owned:
+                    wb.close()
+                return existing_count
+            if owned:
+                wb.close()
+        except Exception as e:
+            logging.warning(f"Failed to count existing records for {src_name}: {e}")
+    return 0
+
+
+def insert_prepared_rows(src_name: str, scfg: dict, batches: list, xlsx: Union[Path, Workbook],
+                         details_sheet: str, args, cumulative_keys: dict = None,
+                         no_csv_files: bool = False) -> Tuple[int, int, int, int, int, dict]:
+    """Insert the rows produced by prepare_rows into the workbook, one CSV file at a time.
+
+    When xlsx is an open Workbook the inserts are made in memory and the caller saves it.
+    no_csv_files is the flag returned by prepare_rows.
+    """
+    if no_csv_files:
+        # Still count existing records even if no new data to ingest
+        existing_count = count_existing_records(src_name, scfg, xlsx)
+        if existing_count:
+            print(f"  -> no new data, but found {existing_count} existing records")
+        return 0, 0, 0, 0, existing_count, {}
+
+    if not batches:
+        # CSVs were read but the date filter left nothing to insert
+        print("  TOTAL existing records: 0\n"
+              "  TOTAL -> per-account added: 0, details added: 0")
+        return 0, 0, 0, 0, 0, {}
+
+    # Only sources with in-range rows pay for reading the sheet's K+ headers
+    raw_map = resolve_raw_map(src_name, scfg, xlsx)
+    logger.debug("  raw_map keys (K+ headers): %s", list(raw_map.keys()) if raw_map else 'None')
+
+    account_sheet = scfg.get("account_sheet")
+    bank_label = scfg.get("bank_label", src_name)
+    account_label = scfg.get("account_label", src_name)
+
     total_acct_added = 0
     total_det_added = 0
     total_nat_count = 0
     total_deduped_count = 0
     total_existing = 0
-    
-    for file_idx, df_in in enumerate(csv_frames, 1):
-        source_file = df_in["__source_file"].iloc[0] if not df_in.empty else "unknown"
-        print(f"\n  Processing file {file_idx}/{len(csv_frames)}: {Path(source_file).name}")
-        print(f"    rows in file: {len(df_in)}")
-        print(f"    CSV headers: {list(df_in.columns)}")
-        
-        norm_df = normalize(df_in, scfg)
-        print(f"    normalized rows: {len(norm_df)}")
-        
-        try:
-            dates = pd.to_datetime(norm_df["date"], errors="coerce")
-            nat_count = dates.isna().sum()
-            print(f"    date dtype: {dates.dtype}, NaT count: {nat_count} of {len(dates)}")
-            if dates.notna().any():
-                print(f"    date min/max: {dates.min()} .. {dates.max()}")
-            norm_df["date"] = dates
-        except (ValueError, TypeError) as e:
-            logging.warning(f"Failed to process dates for file {source_file}: {e}")
-            print(f"    Warning: Date processing failed, skipping file")
-            continue
-        
-        if args.start:
-            start = pd.to_datetime(args.start)
-            norm_df = norm_df[norm_df["date"] >= start]
-        if args.end:
-            end = pd.to_datetime(args.end)
-            norm_df = norm_df[norm_df["date"] <= end]
-        
-        print(f"    rows after date filter: {len(norm_df)}")
-        if norm_df.empty:
-            continue
-        
-        rows = []
-        for idx, nrow in norm_df.iterrows():
-            raw_payload = {}
-            if raw_map:
-                for sheet_header, csv_col in raw_map.items():
-                    raw_payload[csv_col] = df_in.loc[idx, csv_col] if csv_col in df_in.columns else None
-            row_data = {
-                "date": nrow["date"],
-                "amount": float(nrow["amount"]),
-                "description": nrow["description"],
-                "__raw__": raw_payload
-            }
-            
-            # Add automated transaction category if available
-            if "automated_trans_category" in nrow:
-                row_data["automated_trans_category"] = nrow["automated_trans_category"]
-            
-            rows.append(row_data)
-        
+
+    for file_idx, (source_file, rows, nat_count, raw_df) in enumerate(batches, 1):
+        attach_raw_payload(rows, raw_df, raw_map)
+
         # Process this file's data
         acct_added, acct_existing, new_acct_keys = insert_into_account_sheet(
-            xlsx, account_sheet, bank_label, account_label, rows, raw_map=raw_map, 
+            xlsx, account_sheet, bank_label, account_label, rows, raw_map=raw_map,
             source_config=scfg, dry=args.dry_run, start_date=args.start, end_date=args.end,
             cumulative_keys=cumulative_keys, log_dir=getattr(args, 'log_dir_path', None)
         )
@@ -147,9 +258,9 @@ def process_source(src_name: str, scfg: dict, xlsx: Path, details_sheet: str, ar
             xlsx, details_sheet, bank_label, account_label, rows, dry=args.dry_run,
             cumulative_keys=cumulative_keys, log_dir=getattr(args, 'log_dir_path', None)
         )
-        
-        print(f"    -> file added: account={acct_added}, details={det_added}")
-        
+
+        print(f"  {Path(source_file).name} -> file added: account={acct_added}, details={det_added}")
+
         # Update cumulative keys immediately after each file
         if cumulative_keys:
             if new_det_keys:
@@ -160,7 +271,7 @@ def process_source(src_name: str, scfg: dict, xlsx: Path, details_sheet: str, ar
                 if account_sheet not in cumulative_keys['accounts']:
                     cumulative_keys['accounts'][account_sheet] = set()
                 cumulative_keys['accounts'][account_sheet].update(new_acct_keys)
-        
+
         # Accumulate totals
         total_acct_added += acct_added
         total_det_added += det_added
@@ -168,9 +279,18 @@ def process_source(src_name: str, scfg: dict, xlsx: Path, details_sheet: str, ar
         total_deduped_count += len(rows) - det_added
         if file_idx == 1:  # Only count existing records once
             total_existing = acct_existing
-    
-    print(f"  TOTAL existing records: {total_existing}")
-    print(f"  TOTAL -> per-account added: {total_acct_added}, details added: {total_det_added}")
-    
+
+    print(f"  TOTAL existing records: {total_existing}\n"
+          f"  TOTAL -> per-account added: {total_acct_added}, details added: {total_det_added}")
+
     # Return empty new_keys since we've already updated cumulative_keys
-    return total_acct_added, total_det_added, total_nat_count, total_deduped_count, total_existing, {}
\ No newline at end of file
+    return total_acct_added, total_det_added, total_nat_count, total_deduped_count, total_existing, {}
+
+
+def process_source(src_name: str, scfg: dict, xlsx: Path, details_sheet: str, args, cumulative_keys: dict = None) -> Tuple[int, int, int, int, int, dict]:
+    """Process a single data source by processing each CSV file individually."""
+    _, batches, output, no_csv_files = prepare_rows(src_name, scfg, args.start, args.end,
+                                                    logging.getLogger().getEffectiveLevel())
+    print(output, end="")
+    return insert_prepared_rows(src_name, scfg, batches, xlsx, details_sheet, args, cumulative_keys,
+                                no_csv_files)
@@ -1,12 +1,16 @@
 """Main application runner and orchestration."""
 
+import logging
+import os
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from .processor import process_source
+from .processor import insert_prepared_rows, prepare_rows
 from ..config.loader import get_log_directory, load_config
-from ..utils.logging_utils import Tee, setup_logging, utc_log_name
+from ..excel.workbook import open_workbook, save_workbook_safe
+from ..utils.logging_utils import Tee, route_root_log_stream, setup_logging, utc_log_name
 from ..utils.path_utils import create_timestamped_copy, get_timestamp
 
 
@@ -18,10 +22,12 @@ def setup_log_file(log_dir: Path, is_dry_run: bool):
     try:
         log_dir.mkdir(parents=True, exist_ok=True)
         logfile = log_dir / utc_log_name(is_dry_run)
-        log_fp = open(logfile, "w", encoding="utf-8")
         orig_stdout = sys.stdout
-        tee = Tee(orig_stdout, log_fp)
+        tee = Tee.from_path(logfile, orig_stdout)
+        log_fp = tee.streams[-1]
         sys.stdout = tee
+        # Log records go through the same Tee so warnings and debug output land in the log file
+        route_root_log_stream(tee)
         print(f"[logging to] {logfile}")
         return log_fp, orig_stdout, tee
     except (OSError, PermissionError) as e:
@@ -63,12 +69,15 @@ def update_config_with_interactive(cfg: dict, interactive_config: dict):
 def print_summary(sources_processed: int, sources_with_data: int, total_accounts: int, 
                  total_details: int, source_names: list, existing_counts: list, 
                  total_preexisting: int, total_deduped: int, total_nat: int):
-    """Print processing summary."""
-    print(f"\nSummary: {sources_processed} sources processed, {sources_with_data} had data that wasn't already present")
-    print(f"per-account added={total_accounts}, details added={total_details}")
+    """Print processing summary as a single write."""
     existing_breakdown = dict(zip(source_names, existing_counts))
-    print(f"Pre-existing by account: {existing_breakdown}")
-    print(f"Pre-existing rows={total_preexisting}, Deduped rows={total_deduped}, NaT (Not a Time) total={total_nat}")
+    report_lines = [
+        f"\nSummary: {sources_processed} sources processed, {sources_with_data} had data that wasn't already present",
+        f"per-account added={total_accounts}, details added={total_details}",
+        f"Pre-existing by account: {existing_breakdown}",
+        f"Pre-existing rows={total_preexisting}, Deduped rows={total_deduped}, NaT (Not a Time) total={total_nat}",
+    ]
+    sys.stdout.write("\n".join(report_lines) + "\n")
 
 
 def run_ml_inference_if_requested(cfg: dict, xlsx_path: str, should_run_ml: bool):
@@ -103,16 +112,22 @@ def create_working_copy(original_xlsx: Path) -> Path:
 def check_discrepancies(total_accounts: int, total_details: int, source_results: list):
     """Check and report deduplication discrepancies."""
     if total_accounts != total_details:
-        print(f"\nWARNING: Deduplication mismatch - per-account: {total_accounts}, details: {total_details}")
+        report_lines = [f"\nWARNING: Deduplication mismatch - per-account: {total_accounts}, details: {total_details}"]
         discrepancies = [(name, acct, det) for name, acct, det in source_results if acct != det]
         if discrepancies:
-            print("Accounts with discrepancies:")
-            for name, acct_added, det_added in discrepancies:
-                print(f"  {name}: per-account={acct_added}, details={det_added}")
+            report_lines.append("Accounts with discrepancies:")
+            report_lines.extend(f"  {name}: per-account={acct_added}, details={det_added}"
+                                for name, acct_added, det_added in discrepancies)
+        sys.stdout.write("\n".join(report_lines) + "\n")
 
 
-def run_processing(cfg: dict, args, xlsx: Path, details_sheet: str):
-    """Run the main processing loop with cumulative key building."""
+def run_processing(cfg: dict, args, xlsx: Path, details_sheet: str, prepared_cache: dict = None):
+    """Run the main processing loop with cumulative key building.
+
+    If prepared_cache is given it is filled with each source's prepared rows and no-CSV
+    flag, keyed by source name; when it is already filled (e.g. by a dry run) those rows
+    are inserted directly without re-reading the CSVs.
+    """
     total_details = 0
     total_accounts = 0
     total_preexisting = 0
@@ -126,28 +141,68 @@ def run_processing(cfg: dict, args, xlsx: Path, details_sheet: str):
     # Initialize cumulative deduplication keys
     cumulative_keys = {'details': set(), 'accounts': {}}
 
-    for src_name, scfg in cfg["sources"].items():
-        sources_processed += 1
-        acct_added, det_added, nat_count, deduped_count, existing_records, new_keys = process_source(
-            src_name, scfg, xlsx, details_sheet, args, cumulative_keys)
-        
-        # Update cumulative keys with newly added records
-        if new_keys:
-            cumulative_keys['details'].update(new_keys.get('details', set()))
-            for account_sheet, keys in new_keys.get('accounts', {}).items():
-                if account_sheet not in cumulative_keys['accounts']:
-                    cumulative_keys['accounts'][account_sheet] = set()
-                cumulative_keys['accounts'][account_sheet].update(keys)
-        
-        total_accounts += acct_added
-        total_details += det_added
-        total_nat += nat_count
-        total_deduped += deduped_count
-        total_preexisting += existing_records
-        existing_counts.append(existing_records)
-        source_results.append((src_name, acct_added, det_added))
-        if acct_added > 0 or det_added > 0:
-            sources_with_data += 1
+    sources = cfg["sources"]
+    executor = None
+    if prepared_cache:
+        prepared = ((src_name, prepared_cache[src_name][0],
+                     f"\n=== Source: {src_name} ===\n  (using rows prepared during dry run)\n",
+                     prepared_cache[src_name][1])
+                    for src_name in sources)
+    else:
+        # CSV reading, normalization and date filtering are independent per source and run in
+        # worker processes that never touch the workbook. Workbook reads and inserts stay here,
+        # in config order, so cumulative deduplication is deterministic.
+        log_level = logging.getLogger().getEffectiveLevel()
+        max_workers = min(len(sources), os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        if executor:
+            futures = [executor.submit(prepare_rows, src_name, scfg, args.start, args.end, log_level)
+                       for src_name, scfg in sources.items()]
+            prepared = (future.result() for future in futures)
+        else:
+            prepared = (prepare_rows(src_name, scfg, args.start, args.end, log_level)
+                        for src_name, scfg in sources.items())
+
+    wb = None
+    try:
+        for src_name, batches, output, no_csv_files in prepared:
+            if prepared_cache is not None:
+                prepared_cache[src_name] = (batches, no_csv_files)
+            scfg = sources[src_name]
+            sources_processed += 1
+            print(output, end="")
+            if batches and wb is None:
+                # Load the workbook once; all sources insert into it and it is saved once below
+                wb, validated_xlsx, _ = open_workbook(xlsx)
+            acct_added, det_added, nat_count, deduped_count, existing_records, new_keys = insert_prepared_rows(
+                src_name, scfg, batches, wb if wb is not None else xlsx, details_sheet, args, cumulative_keys,
+                no_csv_files)
+
+            # Update cumulative keys with newly added records
+            if new_keys:
+                cumulative_keys['details'].update(new_keys.get('details', set()))
+                for account_sheet, keys in new_keys.get('accounts', {}).items():
+                    if account_sheet not in cumulative_keys['accounts']:
+                        cumulative_keys['accounts'][account_sheet] = set()
+                    cumulative_keys['accounts'][account_sheet].update(keys)
+
+            total_accounts += acct_added
+            total_details += det_added
+            total_nat += nat_count
+            total_deduped += deduped_count
+            total_preexisting += existing_records
+            existing_counts.append(existing_records)
+            source_results.append((src_name, acct_added, det_added))
+            if acct_added > 0 or det_added > 0:
+                sources_with_data += 1
+
+        if wb is not None and not args.dry_run:
+            save_workbook_safe(wb, validated_xlsx)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if wb is not None:
+            wb.close()
 
     source_names = list(cfg["sources"].keys())
     print_summary(sources_processed, sources_with_data, total_accounts, total_details,
@@ -166,7 +221,7 @@ def run_application(args):
     """Main application runner."""
     from ..ui.interactive import get_ingestion_config, get_yes_no
 
-    setup_logging()
+    setup_logging(getattr(args, 'verbose', False))
 
     # Interactive mode if no config provided
     interactive_config = None
@@ -235,8 +290,10 @@ def run_application(args):
         # Pass log directory to args for use in processing
         args.log_dir_path = log_dir
         
+        # Rows prepared by a dry run are reused if the user proceeds with real ingestion
+        prepared_cache = {}
         try:
-            results = run_processing(cfg, args, xlsx, details_sheet)
+            results = run_processing(cfg, args, xlsx, details_sheet, prepared_cache)
         except Exception as e:
             print(f"Processing failed: {e}")
             return
@@ -260,7 +317,7 @@ def run_application(args):
                             return
                     # Re-run without dry-run
                     args.dry_run = False
-                    final_results = run_processing(cfg, args, xlsx, details_sheet)
+                    final_results = run_processing(cfg, args, xlsx, details_sheet, prepared_cache)
                     final_accounts, final_details = final_results[0], final_results[1]
                     final_preexisting, final_deduped, final_nat = final_results[2], final_results[3], final_results[4]
                     final_source_results = final_results[7]
@@ -281,7 +338,6 @@ def run_application(args):
         return
     except Exception as e:
         print(f"ERROR: {e}")
-        import logging
         logging.error(f"Application error: {e}")
         if hasattr(args, 'debug') and getattr(args, 'debug', False):
             print(traceback.format_exc())
@@ -289,6 +345,8 @@ def run_application(args):
     finally:
         # Restore stdout first
         if tee:
+            tee.flush()
+            route_root_log_stream(sys.stderr)
             tee.close()
         sys.stdout = orig_stdout
 
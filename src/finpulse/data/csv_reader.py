@@ -5,12 +5,63 @@ from pathlib import Path
 from typing import List
 
 import pandas as pd
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_csv = None
+    PYARROW_AVAILABLE = False
 
 from .file_collector import collect_files_case_insensitive
 
 
+def read_csv_fast(path: Path, cfg: dict) -> pd.DataFrame:
+    """Read CSV with the multithreaded pyarrow reader, parsing the configured date column in the reader."""
+    encoding = cfg.get("encoding", "utf-8-sig")
+    on_bad_lines = cfg.get("csv_on_bad_lines", "warn")
+
+    def handle_invalid_row(row):
+        if on_bad_lines == "warn":
+            logging.warning(f"Skipping bad line {row.number} in {path}: {row.text}")
+        return "skip"
+
+    read_options = pa_csv.ReadOptions(encoding="utf8" if encoding.lower() in ("utf-8-sig", "utf-8", "utf8") else encoding)
+    parse_options = pa_csv.ParseOptions(
+        delimiter=cfg.get("csv_sep", ","),
+        quote_char='"',
+        double_quote=True,
+        escape_char="\\",
+        invalid_row_handler=None if on_bad_lines == "error" else handle_invalid_row,
+    )
+    # Empty fields read back as NaN in string columns too, as pandas does
+    convert_kwargs = {"strings_can_be_null": True}
+    date_col = cfg.get("date_col")
+    date_format = cfg.get("date_format")
+    if date_col and date_format:
+        # Accept both 2- and 4-digit years, matching robust_parse_dates' year truncation
+        convert_kwargs["column_types"] = {date_col: pa.timestamp("s")}
+        convert_kwargs["timestamp_parsers"] = list(dict.fromkeys([date_format, date_format.replace("%y", "%Y")]))
+    if cfg.get("csv_usecols") is not None:
+        convert_kwargs["include_columns"] = list(cfg.get("csv_usecols"))
+
+    table = pa_csv.read_csv(path, read_options=read_options, parse_options=parse_options,
+                            convert_options=pa_csv.ConvertOptions(**convert_kwargs))
+    return table.to_pandas()
+
+
 def read_csv_robust(path: Path, cfg: dict) -> pd.DataFrame:
     """Read CSV with robust error handling and configuration."""
+    if cfg.get("fast_io", False):
+        if not PYARROW_AVAILABLE:
+            logging.warning("fast_io requested but pyarrow is not installed; using pandas CSV reader")
+        elif cfg.get("csv_names") is None and cfg.get("csv_dtypes") is None:
+            try:
+                return read_csv_fast(path, cfg)
+            except (pa.ArrowInvalid, pa.ArrowKeyError, UnicodeDecodeError) as e:
+                logging.warning(f"Fast CSV read failed for {path}, falling back to pandas: {e}")
+
     kwargs = {
         "engine": cfg.get("csv_engine", "python"),
         "sep": cfg.get("csv_sep", ","),
@@ -1,12 +1,23 @@
 """File collection and discovery utilities."""
 
 import logging
+import os
 from pathlib import Path
 from typing import List
 
 from ..utils.path_utils import validate_path
 
 
+def _list_files(directory: Path) -> List[Path]:
+    """List the regular files (or links to them) directly inside directory.
+
+    os.scandir reports the file type from the directory read itself, so unlike
+    Path.iterdir() + is_file() this doesn't stat every entry.
+    """
+    with os.scandir(directory) as entries:
+        return [Path(entry.path) for entry in entries if entry.is_file()]
+
+
 def collect_files_case_insensitive(pattern: str) -> List[Path]:
     """Collect files matching pattern with case-insensitive matching."""
     base = Path(pattern)
@@ -19,7 +30,7 @@ def collect_files_case_insensitive(pattern: str) -> List[Path]:
     
     exts_ok = {".csv", ".txt", ".ofx", ".qfx"}
     if base.is_dir():
-        return [validate_path(p) for p in base.iterdir() if p.is_file() and p.suffix.lower() in exts_ok]
+        return [validate_path(p) for p in _list_files(base) if p.suffix.lower() in exts_ok]
     
     parent = base.parent if base.parent != Path("") else Path(".")
     name = base.name
@@ -28,9 +39,7 @@ def collect_files_case_insensitive(pattern: str) -> List[Path]:
     try:
         if any(ch in name for ch in "*?["):
             try:
-                for p in parent.glob("*"):
-                    if p.is_file() and p.suffix.lower() in exts_ok:
-                        hits.append(p)
+                hits.extend(p for p in _list_files(parent) if p.suffix.lower() in exts_ok)
             except (OSError, PermissionError) as e:
                 logging.warning(f"Failed to glob files in {parent}: {e}")
         else:
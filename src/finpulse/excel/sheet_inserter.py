@@ -3,16 +3,17 @@
 import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import pandas as pd
+from openpyxl import Workbook
 from openpyxl.formula.translate import Translator
 
 
 from ..utils.date_utils import DATE_SEARCH_PATTERN, to_iso_dateish
 from .workbook import (
     copy_row_styles, find_insert_index, header_map, header_to_index,
-    load_workbook_safe, save_workbook_safe, should_skip_write
+    open_workbook, save_workbook_safe, should_skip_write
 )
 
 
@@ -144,17 +145,22 @@ def fix_shifted_formulas(ws, col_acc_period: int) -> None:
                     continue
 
 
-def insert_into_details(xlsx_path: Path, sheet_name: str, bank_label: str, 
+def insert_into_details(xlsx_path: Union[Path, Workbook], sheet_name: str, bank_label: str, 
                        account_label: str, rows: List[Dict[str, Any]], dry: bool = False,
                        cumulative_keys: dict = None, log_dir: Path = None) -> tuple[int, int, set]:
-    """Insert rows into the Details sheet."""
+    """Insert rows into the Details sheet.
+
+    xlsx_path may be an open Workbook, in which case it is modified in place and left
+    for the caller to save.
+    """
     if not rows:
         return 0, 0, set()
     
-    wb, validated_xlsx = load_workbook_safe(xlsx_path)
+    wb, validated_xlsx, owned = open_workbook(xlsx_path)
     
     if sheet_name not in wb.sheetnames:
-        wb.close()
+        if owned:
+            wb.close()
         raise RuntimeError(f"Sheet '{sheet_name}' not found")
     
     ws = wb[sheet_name]
@@ -314,24 +320,24 @@ def insert_into_details(xlsx_path: Path, sheet_name: str, bank_label: str,
     
     if not dry and added > 0:
         fix_shifted_formulas(ws, col_acc_period)
-        save_workbook_safe(wb, validated_xlsx)
-    elif not dry:
+    if not dry and owned:
         save_workbook_safe(wb, validated_xlsx)
     return added, len(existing_keys), new_keys
 
 
-def insert_into_account_sheet(xlsx_path: Path, sheet_name: str, bank_label: str, account_label: str,
+def insert_into_account_sheet(xlsx_path: Union[Path, Workbook], sheet_name: str, bank_label: str, account_label: str,
                              rows: List[Dict[str, Any]], raw_map: Optional[Dict[str, str]], 
                              source_config: Optional[Dict[str, Any]] = None, dry: bool = False, 
                              start_date=None, end_date=None, cumulative_keys: dict = None, log_dir: Path = None) -> tuple[int, int, set]:
-    """Insert rows into account-specific sheet."""
+    """Insert rows into account-specific sheet (xlsx_path may be an open Workbook, see insert_into_details)."""
     if not rows:
         return 0, 0, set()
     
-    wb, validated_xlsx = load_workbook_safe(xlsx_path)
+    wb, validated_xlsx, owned = open_workbook(xlsx_path)
     
     if sheet_name not in wb.sheetnames:
-        wb.close()
+        if owned:
+            wb.close()
         raise RuntimeError(f"Sheet '{sheet_name}' not found")
     
     ws = wb[sheet_name]
@@ -533,6 +539,6 @@ def insert_into_account_sheet(xlsx_path: Path, sheet_name: str, bank_label: str,
     except Exception as e:
         print(f"Failed to write debug log: {e}")
     
-    if not dry:
+    if not dry and owned:
         save_workbook_safe(wb, validated_xlsx)
     return added, existing_in_range, new_keys
\ No newline at end of file
@@ -3,9 +3,9 @@
 import logging
 from copy import copy as _copy
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple, Union
 
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
 
 from ..utils.path_utils import validate_path
 
@@ -78,6 +78,18 @@ def load_workbook_safe(xlsx_path: Path):
         raise
 
 
+def open_workbook(target: Union[Path, Workbook]) -> Tuple[Workbook, Optional[Path], bool]:
+    """Return (wb, validated_path, owned) for a workbook path or an already-open Workbook.
+
+    A workbook loaded here is owned by the caller, who saves and closes it. One passed in
+    open belongs to whoever opened it and is saved once by them after all inserts.
+    """
+    if isinstance(target, Workbook):
+        return target, None, False
+    wb, validated_xlsx = load_workbook_safe(target)
+    return wb, validated_xlsx, True
+
+
 def save_workbook_safe(wb: Any, xlsx_path: Path) -> None:
     """Save workbook with error handling."""
     try:
@@ -4,20 +4,23 @@ Base model class with common functionality for ML models.
 
 import joblib
 import os
+import pickle
+import warnings
 from .model_factory import ModelFactory
 
 
 class BaseModel:
     """Base class for ML models with common save/load functionality."""
     
-    def __init__(self, algorithm: str, hyperparameters: dict = None):
+    def __init__(self, algorithm: str, hyperparameters: dict = None, n_jobs: int = -1):
         self.algorithm = algorithm
         self.hyperparameters = hyperparameters or {}
+        self.n_jobs = n_jobs
         self.model = None
     
-    def _create_model(self):
-        """Create model instance using factory."""
-        return ModelFactory.create_model(self.algorithm, self.hyperparameters)
+    def _create_model(self, override_n_jobs: bool = False):
+        """Create model instance using factory; override_n_jobs makes self.n_jobs win over the config."""
+        return ModelFactory.create_model(self.algorithm, self.hyperparameters, self.n_jobs, override_n_jobs)
     
     def train(self, X, y):
         """Train the model."""
@@ -32,10 +35,13 @@ class BaseModel:
         return self.model.predict(X)
     
     def save(self, path: str):
-        """Save model to disk."""
+        """Save model to disk, uncompressed so load() can memory-map its arrays."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        joblib.dump(self.model, path)
+        joblib.dump(self.model, path, compress=0, protocol=pickle.HIGHEST_PROTOCOL)
     
     def load(self, path: str):
-        """Load model from disk."""
-        self.model = joblib.load(path)
\ No newline at end of file
+        """Load model from disk (memory-mapped when the artifact is uncompressed)."""
+        with warnings.catch_warnings():
+            # joblib ignores mmap_mode for compressed artifacts; that is expected here
+            warnings.filterwarnings("ignore", message="mmap_mode .* is not compatible with compressed file")
+            self.model = joblib.load(path, mmap_mode="r")
@@ -4,13 +4,24 @@ Configuration validator for ML settings.
 Validates ML configuration including algorithms, hyperparameters, and features.
 """
 
+from .infer import VALID_QUANTIZE
 from .model_factory import ModelFactory, ModelValidationError
 
 
+_DESCRIPTIONS = {
+    'random_forest': 'Ensemble method using multiple decision trees. Good for tabular data.',
+    'logistic_regression': 'Linear model for classification. Fast and interpretable.',
+    'svm': 'Support Vector Machine. Effective for high-dimensional data.',
+    'naive_bayes': 'Probabilistic classifier based on Bayes theorem. Fast and simple.',
+    'decision_tree': 'Tree-based model. Highly interpretable but prone to overfitting.'
+}
+
+
 class MLConfigValidator:
     """Validates ML configuration settings."""
     
-    VALID_TEXT_ENCODERS = {'tfidf', 'sbert'}
+    VALID_TEXT_ENCODERS = frozenset({'tfidf', 'sbert'})
+    _SUPPORTED = frozenset(ModelFactory.get_supported_algorithms())
     
     @classmethod
     def validate_ml_config(cls, ml_config: dict):
@@ -20,13 +31,25 @@ class MLConfigValidator:
         # Validate text encoder
         text_encoder = ml_config.get('text_encoder', 'tfidf')
         if text_encoder not in cls.VALID_TEXT_ENCODERS:
-            errors.append(f"Invalid text_encoder '{text_encoder}'. Valid options: {cls.VALID_TEXT_ENCODERS}")
+            errors.append(f"Invalid text_encoder '{text_encoder}'. Valid options: {sorted(cls.VALID_TEXT_ENCODERS)}")
         
         # Validate rare label threshold
         rare_threshold = ml_config.get('rare_label_threshold', 10)
         if not isinstance(rare_threshold, int) or rare_threshold < 1:
             errors.append("rare_label_threshold must be a positive integer")
         
+        # Validate inference options
+        inference = ml_config.get('inference', {})
+        quantize = inference.get('quantize', 'fp64')
+        if quantize not in VALID_QUANTIZE:
+            errors.append(f"Invalid inference.quantize '{quantize}'. Valid options: {list(VALID_QUANTIZE)}")
+        if not isinstance(inference.get('cache_features', False), bool):
+            errors.append("inference.cache_features must be true or false")
+        
+        for flag, default in (('preserve_formatting', True), ('fast_io', False), ('cache_encoder', False)):
+            if not isinstance(ml_config.get(flag, default), bool):
+                errors.append(f"{flag} must be true or false")
+        
         # Validate category model
         category_model = ml_config.get('category_model', {})
         category_errors = cls._validate_model_config('category_model', category_model)
@@ -56,7 +79,7 @@ class MLConfigValidator:
             errors.append(f"{model_name}: algorithm is required")
             return errors
         
-        if algorithm not in ModelFactory.get_supported_algorithms():
+        if algorithm not in cls._SUPPORTED:
             supported = ModelFactory.get_supported_algorithms()
             errors.append(f"{model_name}: unsupported algorithm '{algorithm}'. Supported: {supported}")
             return errors
@@ -97,11 +120,4 @@ class MLConfigValidator:
     @classmethod
     def _get_algorithm_description(cls, algorithm: str):
         """Get description for an algorithm."""
-        descriptions = {
-            'random_forest': 'Ensemble method using multiple decision trees. Good for tabular data.',
-            'logistic_regression': 'Linear model for classification. Fast and interpretable.',
-            'svm': 'Support Vector Machine. Effective for high-dimensional data.',
-            'naive_bayes': 'Probabilistic classifier based on Bayes theorem. Fast and simple.',
-            'decision_tree': 'Tree-based model. Highly interpretable but prone to overfitting.'
-        }
-        return descriptions.get(algorithm, 'No description available')
\ No newline at end of file
+        return _DESCRIPTIONS.get(algorithm, 'No description available')
\ No newline at end of file
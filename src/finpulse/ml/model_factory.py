@@ -11,6 +11,10 @@ from sklearn.naive_bayes import MultinomialNB
 from sklearn.tree import DecisionTreeClassifier
 
 
+# YAML spellings of "no value" that hyperparameters may arrive as
+_NULL_SENTINELS = frozenset({'null', 'None'})
+
+
 class ModelValidationError(Exception):
     """Raised when model configuration is invalid."""
     pass
@@ -22,47 +26,54 @@ class ModelFactory:
     SUPPORTED_ALGORITHMS = {
         'random_forest': {
             'class': RandomForestClassifier,
-            'valid_params': {
+            'valid_params': frozenset({
                 'n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf',
                 'max_features', 'bootstrap', 'n_jobs', 'random_state', 'class_weight'
-            }
+            }),
+            # Trees are fitted independently and release the GIL, so n_jobs scales the fit
+            'parallel': True
         },
         'logistic_regression': {
             'class': LogisticRegression,
-            'valid_params': {
+            'valid_params': frozenset({
                 'penalty', 'dual', 'tol', 'C', 'fit_intercept', 'intercept_scaling',
                 'class_weight', 'random_state', 'solver', 'max_iter', 'multi_class',
                 'verbose', 'warm_start', 'n_jobs', 'l1_ratio'
-            }
+            })
         },
         'svm': {
             'class': SVC,
-            'valid_params': {
+            'valid_params': frozenset({
                 'C', 'kernel', 'degree', 'gamma', 'coef0', 'shrinking', 'probability',
                 'tol', 'cache_size', 'class_weight', 'verbose', 'max_iter',
                 'decision_function_shape', 'break_ties', 'random_state'
-            }
+            })
         },
         'naive_bayes': {
             'class': MultinomialNB,
-            'valid_params': {
+            'valid_params': frozenset({
                 'alpha', 'fit_prior', 'class_prior'
-            }
+            })
         },
         'decision_tree': {
             'class': DecisionTreeClassifier,
-            'valid_params': {
+            'valid_params': frozenset({
                 'criterion', 'splitter', 'max_depth', 'min_samples_split',
                 'min_samples_leaf', 'min_weight_fraction_leaf', 'max_features',
                 'random_state', 'max_leaf_nodes', 'min_impurity_decrease',
                 'class_weight', 'ccp_alpha'
-            }
+            })
         }
     }
     
     @classmethod
-    def create_model(cls, algorithm: str, hyperparameters: dict = None):
-        """Create a model instance with validation."""
+    def create_model(cls, algorithm: str, hyperparameters: dict = None, n_jobs: int = None,
+                     override_n_jobs: bool = False):
+        """Create a model instance with validation.
+
+        n_jobs is applied to algorithms that fit in parallel unless hyperparameters set it;
+        with override_n_jobs it replaces a configured n_jobs too (e.g. to cap K-fold fits).
+        """
         if not algorithm:
             raise ModelValidationError("Algorithm must be specified")
         
@@ -77,25 +88,26 @@ class ModelFactory:
         valid_params = model_info['valid_params']
         
         # Validate hyperparameters
+        clean_params = {}
         if hyperparameters:
-            invalid_params = set(hyperparameters.keys()) - valid_params
+            invalid_params = [key for key in hyperparameters if key not in valid_params]
             if invalid_params:
                 raise ModelValidationError(
-                    f"Invalid hyperparameters for {algorithm}: {invalid_params}. "
+                    f"Invalid hyperparameters for {algorithm}: {set(invalid_params)}. "
                     f"Valid parameters: {sorted(valid_params)}"
                 )
             
             # Handle null values in YAML (converted to None)
-            clean_params = {}
             for key, value in hyperparameters.items():
-                if value == 'null' or value == 'None':
+                if isinstance(value, str) and value in _NULL_SENTINELS:
                     clean_params[key] = None
                 else:
                     clean_params[key] = value
-            
-            return model_class(**clean_params)
-        else:
-            return model_class()
+        
+        if (n_jobs is not None and model_info.get('parallel')
+                and (override_n_jobs or 'n_jobs' not in clean_params)):
+            clean_params['n_jobs'] = n_jobs
+        return model_class(**clean_params)
     
     @classmethod
     def get_supported_algorithms(cls):
@@ -8,11 +8,58 @@ Responsibilities:
  - Log summary statistics
 """
 
+import hashlib
+
 import pandas as pd
 import yaml
 import joblib
 from pathlib import Path
-from .preprocess import load_and_prepare_details
+from openpyxl import Workbook, load_workbook
+from .infer import predict_labels
+from .preprocess import REQUIRED_COLUMNS, check_required_columns, read_details
+from .text_encoder import TextEncoder, open_cache
+
+
+def _write_predictions_streaming(xlsx_path: str, target_rows: list, predictions: dict):
+    """Rewrite the workbook through write_only sheets with predictions placed in Details.
+
+    Values and formulas of every worksheet are kept; cell styles, column widths, merged
+    cells, data validation, defined names, charts and other workbook-level objects are not.
+    predictions maps a Details header to one value per entry of target_rows.
+    """
+    src = load_workbook(xlsx_path, read_only=True)
+    out = Workbook(write_only=True)
+    for ws_src in src.worksheets:
+        ws_out = out.create_sheet(ws_src.title)
+        rows = ws_src.iter_rows(values_only=True)
+        if ws_src.title != "Details":
+            for row in rows:
+                ws_out.append(row)
+            continue
+
+        headers = next(rows, ())
+        ws_out.append(headers)
+        updates = {}
+        for header, values in predictions.items():
+            if header in headers:
+                col = headers.index(header)
+                for row_idx, value in zip(target_rows, values):
+                    updates.setdefault(row_idx, []).append((col, value))
+        for row_idx, row in enumerate(rows, 2):
+            if row_idx in updates:
+                row = list(row)
+                for col, value in updates[row_idx]:
+                    if col >= len(row):
+                        row.extend([None] * (col + 1 - len(row)))
+                    row[col] = value
+            ws_out.append(row)
+    src.close()
+    out.save(xlsx_path)
+
+
+def _encode_texts(encoder, texts, encoder_key: str, texts_hash: str):
+    """Transform texts; encoder_key and texts_hash stand in for both when cached with joblib.Memory."""
+    return encoder.transform(texts)
 
 
 def run_ml_pipeline(cfg, xlsx_path: str):
@@ -32,96 +79,120 @@ def run_ml_pipeline(cfg, xlsx_path: str):
         meta = yaml.safe_load(f)
     version = meta["version"]
 
-    # Check all required model files exist
-    required_files = [
-        models_dir / f"category_encoder_v{version}.joblib",
-        models_dir / f"subcategory_encoder_v{version}.joblib",
-        models_dir / f"category_v{version}.joblib",
-        models_dir / f"subcategory_v{version}.joblib",
-    ]
-    missing = [f.name for f in required_files if not f.exists()]
-    if missing:
-        print(f"⚠️ Missing model files: {', '.join(missing)}. Re-train using 'finpulse ml train'.")
-        return
-
     # Load models and encoders
-    from .text_encoder import TextEncoder
-    
-    # Load text encoders properly
-    category_encoder = TextEncoder(method=meta.get("global", {}).get("encoder", "tfidf"))
-    category_encoder.load(str(models_dir / f"category_encoder_v{version}.joblib"))
-    
-    subcategory_encoder = TextEncoder(method=meta.get("global", {}).get("encoder", "tfidf"))
-    subcategory_encoder.load(str(models_dir / f"subcategory_encoder_v{version}.joblib"))
-    
-    category_model = joblib.load(models_dir / f"category_v{version}.joblib")
-    subcategory_model = joblib.load(models_dir / f"subcategory_v{version}.joblib")
+    encoder_method = meta.get("global", {}).get("encoder", "tfidf")
+    category_encoder = TextEncoder(method=encoder_method)
+    subcategory_encoder = TextEncoder(method=encoder_method)
+
+    bundle_file = models_dir / f"bundle_v{version}.joblib"
+    if bundle_file.exists():
+        # Uncompressed bundle: memory-map the arrays instead of copying them (read-only)
+        bundle = joblib.load(bundle_file, mmap_mode="r")
+        category_encoder.vectorizer = bundle["category_encoder"]
+        subcategory_encoder.vectorizer = bundle["subcategory_encoder"]
+        category_model = bundle["category"]
+        subcategory_model = bundle["subcategory"]
+    else:
+        # Versions trained before bundles existed only have the per-model files
+        required_files = [
+            models_dir / f"category_encoder_v{version}.joblib",
+            models_dir / f"subcategory_encoder_v{version}.joblib",
+            models_dir / f"category_v{version}.joblib",
+            models_dir / f"subcategory_v{version}.joblib",
+        ]
+        missing = [f.name for f in required_files if not f.exists()]
+        if missing:
+            print(f"⚠️ Missing model files: {', '.join(missing)}. Re-train using 'finpulse ml train'.")
+            return
+
+        category_encoder.load(str(models_dir / f"category_encoder_v{version}.joblib"))
+        subcategory_encoder.load(str(models_dir / f"subcategory_encoder_v{version}.joblib"))
+        category_model = joblib.load(models_dir / f"category_v{version}.joblib")
+        subcategory_model = joblib.load(models_dir / f"subcategory_v{version}.joblib")
+
+    # Get feature configurations
+    category_features = ml_cfg.get("category_model", {}).get("features", ["Transaction Description", "Transaction Type"])
+    subcategory_features = ml_cfg.get("subcategory_model", {}).get("features", ["Transaction Description", "Automated Trans. Category", "Transaction Type"])
 
-    # Load workbook
-    labeled_df, unlabeled_df = load_and_prepare_details(xlsx_path)
-    df = pd.read_excel(xlsx_path, sheet_name="Details")
+    # Load the Details values once, only the columns inference needs; the openpyxl load
+    # below is only for writing predictions back
+    df = read_details(xlsx_path, REQUIRED_COLUMNS + list(category_features or []) + list(subcategory_features or []),
+                      fast_io=ml_cfg.get("fast_io", False))
+    check_required_columns(df.columns)
 
     # Filter unlabeled
-    mask_unlabeled = df["Category"].isna() | df["Subcategory"].isna()
-    df_unlabeled = df[mask_unlabeled].copy()
+    mask_unlabeled = pd.isna(df["Category"].to_numpy()) | pd.isna(df["Subcategory"].to_numpy())
+    df_unlabeled = df.loc[mask_unlabeled]  # only read from below, so no defensive copy
 
     if df_unlabeled.empty:
         print("✅ No unlabeled transactions found. Nothing to predict.")
         return
 
-    # Get feature configurations
-    category_features = ml_cfg.get("category_model", {}).get("features", ["Transaction Description", "Transaction Type"])
-    subcategory_features = ml_cfg.get("subcategory_model", {}).get("features", ["Transaction Description", "Automated Trans. Category", "Transaction Type"])
-    
     def build_text_features(df, feature_columns):
         """Build concatenated text features from specified columns."""
         if not feature_columns:
-            return pd.Series([""] * len(df))
+            return pd.Series("", index=df.index, dtype="string")
         
-        text_series = df[feature_columns[0]].astype(str).fillna("")
-        for col in feature_columns[1:]:
-            if col in df.columns:
-                text_series = text_series + " " + df[col].astype(str).fillna("")
-        return text_series.str.lower()
+        # Convert each column once (NaN -> "", as in preprocess) and join row-wise in a single pass
+        columns = [feature_columns[0]] + [col for col in feature_columns[1:] if col in df.columns]
+        arrays = [df[col].fillna("").astype(str).to_numpy(dtype=object) for col in columns]
+        return pd.Series([" ".join(parts).lower() for parts in zip(*arrays)], index=df.index)
     
-    X_category_text = build_text_features(df_unlabeled, category_features)
-    X_subcategory_text = build_text_features(df_unlabeled, subcategory_features)
-
-    X_category = category_encoder.transform(X_category_text)
-    X_subcategory = subcategory_encoder.transform(X_subcategory_text)
-
-    # Predict categories and subcategories
-    preds_category = category_model.predict(X_category)
-    preds_subcategory = subcategory_model.predict(X_subcategory)
+    # Both models often use the same feature columns; build each distinct text input once
+    text_by_features = {}
+    for features in (category_features, subcategory_features):
+        key = tuple(features or ())
+        if key not in text_by_features:
+            text_by_features[key] = build_text_features(df_unlabeled, features)
+    X_category_text = text_by_features[tuple(category_features or ())]
+    X_subcategory_text = text_by_features[tuple(subcategory_features or ())]
+
+    # Predict categories and subcategories. Recurring merchants repeat the same text, so each
+    # distinct text is encoded and predicted once and the labels are expanded back per row.
+    inference_cfg = ml_cfg.get("inference", {})
+    quantize = inference_cfg.get("quantize", "fp64")
+
+    # Optionally memoize encoded features on disk, keyed by model version and a hash of the
+    # texts, so re-running inference over the same rows skips the transform
+    encode = _encode_texts
+    if inference_cfg.get("cache_features", False):
+        encode = open_cache(models_dir / "cache").cache(_encode_texts, ignore=["encoder", "texts"])
+
+    def predict_distinct(name, encoder, model, texts):
+        codes, uniques = pd.factorize(texts)
+        texts_hash = hashlib.blake2b("\0".join(uniques).encode("utf-8")).hexdigest()
+        X = encode(encoder, pd.Series(uniques), f"{name}_v{version}_{meta.get('trained_on', '')}", texts_hash)
+        return predict_labels(model, X, quantize)[codes]
+
+    preds_category = predict_distinct("category", category_encoder, category_model, X_category_text)
+    preds_subcategory = predict_distinct("subcategory", subcategory_encoder, subcategory_model, X_subcategory_text)
 
     df.loc[mask_unlabeled, "Category"] = preds_category
     df.loc[mask_unlabeled, "Subcategory"] = preds_subcategory
 
-    # Save results preserving formatting
-    from openpyxl import load_workbook
-    wb = load_workbook(xlsx_path)
-    ws = wb["Details"]
-    
-    # Find column indices
-    col_category = col_subcategory = None
-    for c in range(1, ws.max_column + 1):
-        header = ws.cell(row=1, column=c).value
-        if header == "Category":
-            col_category = c
-        elif header == "Subcategory":
-            col_subcategory = c
-    
-    # Update only the prediction cells
-    unlabeled_indices = df_unlabeled.index
-    for i, (pred_category, pred_subcategory) in enumerate(zip(preds_category, preds_subcategory)):
-        row_idx = unlabeled_indices[i] + 2  # +2 for 1-based indexing and header
-        if col_category:
-            ws.cell(row=row_idx, column=col_category).value = pred_category
-        if col_subcategory:
-            ws.cell(row=row_idx, column=col_subcategory).value = pred_subcategory
-    
-    wb.save(xlsx_path)
-    wb.close()
+    target_rows = (df_unlabeled.index.to_numpy() + 2).tolist()  # +2 for 1-based indexing and header
+    if not ml_cfg.get("preserve_formatting", True):
+        _write_predictions_streaming(xlsx_path, target_rows,
+                                     {"Category": preds_category.tolist(), "Subcategory": preds_subcategory.tolist()})
+    else:
+        # Save results preserving formatting
+        wb = load_workbook(xlsx_path)
+        ws = wb["Details"]
+
+        # Find column indices from the header row, fetched in one pass (first match wins)
+        headers = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        col_category = headers.index("Category") + 1 if "Category" in headers else None
+        col_subcategory = headers.index("Subcategory") + 1 if "Subcategory" in headers else None
+
+        # Update only the prediction cells; row numbers and labels are computed up front as plain lists
+        for col_idx, preds in ((col_category, preds_category), (col_subcategory, preds_subcategory)):
+            if not col_idx:
+                continue
+            for row_idx, pred in zip(target_rows, preds.tolist()):
+                ws.cell(row=row_idx, column=col_idx, value=pred)
+
+        wb.save(xlsx_path)
+        wb.close()
 
     print(f"✅ ML predictions written to '{Path(xlsx_path).name}'.")
     print(f"   Category filled by ML: {len(preds_category)} rows")
@@ -8,28 +8,119 @@ Responsibilities:
  - Clean and normalize text fields
 """
 
+import logging
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from typing import Iterable, Optional, Set, Tuple
+try:
+    import python_calamine  # noqa: F401 - backs pandas' "calamine" read_excel engine
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+# pandas only ships the "calamine" read_excel engine from 2.2 on
+PANDAS_HAS_CALAMINE = tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2)
 
+REQUIRED_COLUMNS = ["Transaction Description", "Automated Trans. Category", "Transaction Type", "Category", "Subcategory"]
 
-def load_and_prepare_details(xlsx_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+
+def check_required_columns(columns: Iterable[str]) -> None:
+    """Raise ValueError if a required Details column is missing (header whitespace is ignored)."""
+    present = {str(col).strip() for col in columns}
+    for col in REQUIRED_COLUMNS:
+        if col not in present:
+            raise ValueError(f"Required column missing: {col}")
+
+
+def _read_details_values(xlsx_path: str, wanted: Optional[Set[str]]) -> pd.DataFrame:
+    """
+    Reads the Details worksheet from openpyxl's values-only row iterator.
+
+    Follows pd.read_excel's openpyxl path (unnamed/duplicate header naming, trailing blank
+    rows dropped, empty and error cells as NaN, integral float columns as int) but only
+    converts the wanted columns and skips the text-parser pass. Unlike read_excel, strings
+    such as "NA" or "N/A" stay text.
+    """
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb["Details"]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        body = list(rows)
+    finally:
+        wb.close()
+    if header is None:
+        return pd.DataFrame()
+
+    while body and all(v is None or v == "" for v in body[-1]):
+        body.pop()
+
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None or name == "" else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+
+    data = {}
+    for i, name in enumerate(names):
+        if wanted is not None and str(name).strip() not in wanted:
+            continue
+        values = [row[i] if i < len(row) else None for row in body]
+        values = [np.nan if v is None or v == "" or (isinstance(v, str) and v in ERROR_CODES) else v
+                  for v in values]
+        col = pd.Series(values, dtype=object).infer_objects()
+        if col.dtype == np.float64 and len(col) and not col.isna().any() and (col % 1 == 0).all():
+            col = col.astype(np.int64)
+        data[name] = col
+    return pd.DataFrame(data)
+
+
+def read_details(xlsx_path: str, columns: Optional[Iterable[str]] = None, fast_io: bool = False) -> pd.DataFrame:
+    """
+    Reads the Details worksheet, keeping only the given columns (header whitespace ignored).
+
+    fast_io uses the Rust-backed calamine engine when python-calamine and pandas>=2.2 are installed.
+    """
+    wanted = {str(col).strip() for col in columns} if columns is not None else None
+    if fast_io:
+        if CALAMINE_AVAILABLE and PANDAS_HAS_CALAMINE:
+            usecols = (lambda col: str(col).strip() in wanted) if wanted is not None else None
+            return pd.read_excel(xlsx_path, sheet_name="Details", engine="calamine", usecols=usecols)
+        if not CALAMINE_AVAILABLE:
+            logging.warning("fast_io requested but python-calamine is not installed; using openpyxl to read Excel")
+        else:
+            logging.warning(f"fast_io requested but pandas {pd.__version__} has no calamine engine "
+                            "(needs pandas>=2.2); using openpyxl to read Excel")
+    return _read_details_values(xlsx_path, wanted)
+
+
+def load_and_prepare_details(xlsx_path: str, columns: Optional[Iterable[str]] = None,
+                             fast_io: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Loads the Details worksheet and splits into labeled and unlabeled datasets.
+
+    columns limits the read to the listed headers in addition to the required ones.
     """
-    df = pd.read_excel(xlsx_path, sheet_name="Details")
+    if columns is not None:
+        columns = REQUIRED_COLUMNS + list(columns)
+    df = read_details(xlsx_path, columns, fast_io)
 
     # Normalize column names to avoid mismatch
     df.columns = [col.strip() for col in df.columns]
 
     # Ensure required columns exist
-    required_cols = ["Transaction Description", "Automated Trans. Category", "Transaction Type", "Category", "Subcategory"]
-    for col in required_cols:
-        if col not in df.columns:
-            raise ValueError(f"Required column missing: {col}")
+    check_required_columns(df.columns)
 
     # Clean and unify text for description/category/type columns
     for col in ["Transaction Description", "Automated Trans. Category", "Transaction Type"]:
-        df[col] = df[col].astype(str).fillna("").str.lower().str.strip()
+        # One C-level lower/strip pass over a fixed-width array instead of chained .str ops
+        df[col] = np.char.strip(np.char.lower(df[col].fillna("").to_numpy(dtype=str)))
 
     # Separate labeled vs unlabeled rows
     labeled_df = df[df["Category"].notna() & df["Subcategory"].notna()].copy()
@@ -9,46 +9,135 @@ Workflow:
  5. Save models, encoder, and metadata
 """
 
+import copy
+import hashlib
+import logging
+import os
+import pickle
 from datetime import datetime
 from pathlib import Path
 
+import joblib
+import numpy as np
 import pandas as pd
 import yaml
+from joblib import Parallel, delayed
 from sklearn.metrics import accuracy_score, f1_score
-from sklearn.model_selection import KFold
+from sklearn.model_selection import KFold, StratifiedKFold
 
 from .base_model import BaseModel
 from .preprocess import load_and_prepare_details
-from .text_encoder import TextEncoder
-from .utils_model import bump_model_version, save_metadata
+from .text_encoder import TextEncoder, open_cache
+from .utils_model import YAML_LOADER, bump_model_version, save_metadata
 from .config_validator import MLConfigValidator
 
+logger = logging.getLogger(__name__)
+
 
 def evaluate_model_kfold(model, X, y, k=5):
     """Perform k-fold cross-validation on a model."""
-    if not hasattr(model, 'train') or not hasattr(model, 'predict'):
-        raise ValueError("Model must have train and predict methods")
-    if k < 2 or k > 20:
-        raise ValueError("k must be between 2 and 20")
-    
-    kf = KFold(n_splits=k, shuffle=True, random_state=42)
-    accuracies, f1_scores = [], []
-    
-    for train_idx, test_idx in kf.split(X):
+    return evaluate_models_kfold([(model, X, y)], k)[0]
+
+
+def _fit_fold(group, features, train_idx, test_idx, n_jobs, encoder_type=None):
+    """Fit one fold for every (model, y) in group sharing features.
+
+    features is an encoded matrix that is sliced per fold, or, when encoder_type is
+    given, the raw texts: a fresh encoder is then fitted on the training rows only so
+    held-out terms never reach the vocabulary or IDF weights. Returns one
+    (accuracy, f1_macro) per model, or None where the fold failed.
+    """
+    try:
+        if encoder_type:
+            train_texts, test_texts = features.iloc[train_idx], features.iloc[test_idx]
+            encoder = TextEncoder(method=encoder_type)
+            encoder.fit(train_texts)
+            X_train, X_test = encoder.transform(train_texts), encoder.transform(test_texts)
+        else:
+            X_train, X_test = features[train_idx], features[test_idx]
+    except ValueError as e:
+        logger.warning(f"K-fold iteration failed: {e}")
+        return [None] * len(group)
+
+    scores = []
+    for model, y in group:
         try:
-            X_train, X_test = X[train_idx], X[test_idx]
+            model = copy.deepcopy(model)
+            if hasattr(model, 'n_jobs'):
+                # The fold cap also replaces a configured n_jobs, which only applies to the
+                # final full-data fit; folds run concurrently and would oversubscribe the cores
+                model.n_jobs = n_jobs
+                model.model = model._create_model(override_n_jobs=True)
             y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
             
             model.train(X_train, y_train)
             preds = model.predict(X_test)
-            accuracies.append(accuracy_score(y_test, preds))
-            f1_scores.append(f1_score(y_test, preds, average="macro"))
-        except Exception as e:
-            import logging
-            logging.warning(f"K-fold iteration failed: {e}")
-            continue
+            scores.append((accuracy_score(y_test, preds), f1_score(y_test, preds, average="macro")))
+        except ValueError as e:  # includes np.linalg.LinAlgError
+            logger.warning(f"K-fold iteration failed: {e}")
+            scores.append(None)
+    return scores
+
+
+def evaluate_models_kfold(entries, k=5, encoder_type=None):
+    """Cross-validate several (model, features, y) entries over one shared k-fold split.
+
+    All entries must cover the same rows. features is an encoded matrix, or raw texts
+    to be encoded per fold when encoder_type is given (see _fit_fold); entries passing
+    the same features object share one slice/encoder per fold. The split is computed
+    once and the (fold, features) tasks run in a thread pool: the sklearn fits release
+    the GIL and threads share the data without pickling it.
+    Returns [(accuracies, f1_scores), ...] in entry order.
+    """
+    for model, _, _ in entries:
+        if not hasattr(model, 'train') or not hasattr(model, 'predict'):
+            raise ValueError("Model must have train and predict methods")
+    if k < 2 or k > 20:
+        raise ValueError("k must be between 2 and 20")
+    
+    groups = {}
+    for i, (_, features, _) in enumerate(entries):
+        groups.setdefault(id(features), (features, []))[1].append(i)
     
-    return accuracies, f1_scores
+    # Stratify on the joint labels so rare classes land in every fold they can; fall back to
+    # plain KFold when no class has k members
+    strata = pd.MultiIndex.from_arrays([y.to_numpy() for _, _, y in entries]).factorize()[0]
+    counts = np.bincount(strata)
+    if counts.max() >= k:
+        # Pool label combinations with fewer than k rows into one catch-all stratum (or the
+        # largest one if the pool is itself too small) so StratifiedKFold can place them
+        # without its "least populated class" warning
+        small = counts[strata] < k
+        if small.any():
+            strata = np.where(small, counts.size if small.sum() >= k else counts.argmax(), strata)
+        folds = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=42).split(strata, strata))
+    else:
+        folds = list(KFold(n_splits=k, shuffle=True, random_state=42).split(strata))
+    tasks = [(train_idx, test_idx, features, idxs)
+             for train_idx, test_idx in folds for features, idxs in groups.values()]
+    # Split the cores between concurrent fits so parallel models don't oversubscribe them
+    fold_jobs = max(1, (os.cpu_count() or 1) // (len(folds) * len(entries)))
+    outputs = Parallel(n_jobs=-1, backend="threading")(
+        delayed(_fit_fold)([(entries[i][0], entries[i][2]) for i in idxs],
+                           features, train_idx, test_idx, fold_jobs, encoder_type)
+        for train_idx, test_idx, features, idxs in tasks
+    )
+    
+    results = [([], []) for _ in entries]
+    for (_, _, _, idxs), scores in zip(tasks, outputs):
+        for i, score in zip(idxs, scores):
+            if score is not None:
+                accuracies, f1_scores = results[i]
+                accuracies.append(score[0])
+                f1_scores.append(score[1])
+    return results
+
+
+def _fit_encoder(encoder_type: str, texts, texts_hash: str):
+    """Fit a TextEncoder; texts_hash stands in for texts when cached with joblib.Memory."""
+    encoder = TextEncoder(method=encoder_type)
+    encoder.fit(texts)
+    return encoder
 
 
 def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes: str = ""):
@@ -72,7 +161,7 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
     # Load config safely
     try:
         with open(cfg_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
+            cfg = yaml.load(f, Loader=YAML_LOADER)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML config file: {e}")
     except Exception as e:
@@ -90,53 +179,63 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
     encoder_type = ml_cfg.get("text_encoder", "tfidf")
     rare_thresh = ml_cfg.get("rare_label_threshold", 10)
 
+    # Create feature sets based on config
+    category_features = ml_cfg.get("category_model", {}).get("features", ["Transaction Description", "Transaction Type"])
+    subcategory_features = ml_cfg.get("subcategory_model", {}).get("features", ["Transaction Description", "Automated Trans. Category", "Transaction Type"])
+    
     print(f"Loading data from {xlsx_path}...")
     try:
-        labeled_df, _ = load_and_prepare_details(str(xlsx_path))
+        labeled_df, _ = load_and_prepare_details(
+            str(xlsx_path), list(category_features or []) + list(subcategory_features or []),
+            fast_io=ml_cfg.get("fast_io", False))
         if labeled_df.empty:
             raise ValueError("No labeled data found in the workbook")
     except Exception as e:
         raise RuntimeError(f"Failed to load training data: {e}")
 
-    # Create feature sets based on config
-    category_features = ml_cfg.get("category_model", {}).get("features", ["Transaction Description", "Transaction Type"])
-    subcategory_features = ml_cfg.get("subcategory_model", {}).get("features", ["Transaction Description", "Automated Trans. Category", "Transaction Type"])
-    
     def build_text_features(df, feature_columns):
         """Build concatenated text features from specified columns."""
         if not feature_columns:
-            return pd.Series([""] * len(df))
+            return pd.Series("", index=df.index, dtype="string")
         
-        # Start with first column
-        first_col = None
+        columns = [col for col in feature_columns if col in df.columns]
         for col in feature_columns:
-            if col in df.columns:
-                first_col = col
-                break
-            else:
+            if col not in df.columns:
                 print(f"Warning: Feature column '{col}' not found in data")
         
-        if not first_col:
-            return pd.Series([""] * len(df))
-            
-        text_series = df[first_col].fillna("")
-        for col in feature_columns:
-            if col != first_col and col in df.columns:
-                text_series = text_series + " " + df[col].fillna("")
-        return text_series
+        if not columns:
+            return pd.Series("", index=df.index, dtype="string")
+        
+        # Convert each column once (NaN -> "", as in preprocess) and join row-wise in a single pass
+        arrays = [df[col].fillna("").astype(str).to_numpy(dtype=object) for col in columns]
+        return pd.Series([" ".join(parts) for parts in zip(*arrays)], index=df.index)
     
+    # Models configured with the same feature columns share one encoder and matrix
+    shared_features = list(category_features or []) == list(subcategory_features or [])
     category_text_features = build_text_features(labeled_df, category_features)
-    subcategory_text_features = build_text_features(labeled_df, subcategory_features)
+    subcategory_text_features = (category_text_features if shared_features
+                                 else build_text_features(labeled_df, subcategory_features))
+
+    # Optionally memoize fitted TF-IDF encoders on disk, keyed by a hash of the training
+    # text, so retraining on an unchanged corpus skips the vocabulary fit
+    cache_encoder = ml_cfg.get("cache_encoder", False) and encoder_type == "tfidf"
+    fit_encoder = _fit_encoder
+    if cache_encoder:
+        cache_dir = Path(__file__).parent / "models" / "cache"
+        fit_encoder = open_cache(cache_dir).cache(_fit_encoder, ignore=["texts"])
+
+    def encode(texts):
+        texts_hash = (hashlib.blake2b("\0".join(texts.tolist()).encode("utf-8")).hexdigest()
+                      if cache_encoder else "")
+        encoder = fit_encoder(encoder_type, texts, texts_hash)
+        return encoder, encoder.transform(texts)
 
     try:
-        category_encoder = TextEncoder(method=encoder_type)
-        subcategory_encoder = TextEncoder(method=encoder_type)
-        
-        category_encoder.fit(category_text_features)
-        subcategory_encoder.fit(subcategory_text_features)
-        
-        X_category = category_encoder.transform(category_text_features)
-        X_subcategory = subcategory_encoder.transform(subcategory_text_features)
+        category_encoder, X_category = encode(category_text_features)
+        if shared_features:
+            subcategory_encoder, X_subcategory = category_encoder, X_category
+        else:
+            subcategory_encoder, X_subcategory = encode(subcategory_text_features)
     except Exception as e:
         raise RuntimeError(f"Text encoding failed: {e}")
 
@@ -161,8 +260,16 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
 
         # K-fold evaluation
         print("\nPerforming 5-fold cross-validation...")
-        acc_category, f1_category = evaluate_model_kfold(category_model, X_category, y_category)
-        acc_subcategory, f1_subcategory = evaluate_model_kfold(subcategory_model, X_subcategory, y_subcategory)
+        # TF-IDF learns its vocabulary from the data, so it is refit on each training fold;
+        # pretrained encoders (sbert) don't, and their full matrix is sliced instead
+        if encoder_type == "tfidf":
+            cv_entries = [(category_model, category_text_features, y_category),
+                          (subcategory_model, subcategory_text_features, y_subcategory)]
+        else:
+            cv_entries = [(category_model, X_category, y_category),
+                          (subcategory_model, X_subcategory, y_subcategory)]
+        (acc_category, f1_category), (acc_subcategory, f1_subcategory) = evaluate_models_kfold(
+            cv_entries, encoder_type="tfidf" if encoder_type == "tfidf" else None)
     except Exception as e:
         raise RuntimeError(f"Model training/evaluation failed: {e}")
 
@@ -183,6 +290,7 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
         if not str(models_dir).startswith(str(base_dir)):
             raise ValueError("Invalid models directory path")
         models_dir.mkdir(exist_ok=True)
+        models_dir_resolved = str(models_dir.resolve())  # resolved once for the checks below
         
         metadata_file = models_dir / "metadata.yaml"
         if not str(metadata_file).startswith(str(models_dir)):
@@ -199,16 +307,28 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
         subcategory_encoder_file = models_dir / f"subcategory_encoder_v{safe_version}.joblib"
         category_model_file = models_dir / f"category_v{safe_version}.joblib"
         subcategory_model_file = models_dir / f"subcategory_v{safe_version}.joblib"
+        bundle_file = models_dir / f"bundle_v{safe_version}.joblib"
         
         # Ensure files are within models directory
-        for file_path in [category_encoder_file, subcategory_encoder_file, category_model_file, subcategory_model_file]:
-            if not str(file_path.resolve()).startswith(str(models_dir.resolve())):
+        for file_path in [category_encoder_file, subcategory_encoder_file, category_model_file,
+                          subcategory_model_file, bundle_file]:
+            if not str(file_path.resolve()).startswith(models_dir_resolved):
                 raise ValueError(f"Invalid file path: {file_path}")
         
         category_encoder.save(str(category_encoder_file))
         subcategory_encoder.save(str(subcategory_encoder_file))
         final_category_model.save(str(category_model_file))
         final_subcategory_model.save(str(subcategory_model_file))
+
+        # Inference loads this single uncompressed artifact with mmap_mode="r", so the large
+        # arrays are paged in from the file cache instead of being decompressed and copied
+        joblib.dump({
+            "version": version_str,
+            "category_encoder": category_encoder.vectorizer,
+            "subcategory_encoder": subcategory_encoder.vectorizer,
+            "category": final_category_model.model,
+            "subcategory": final_subcategory_model.model,
+        }, bundle_file, compress=0, protocol=pickle.HIGHEST_PROTOCOL)
     except Exception as e:
         raise RuntimeError(f"Failed to save models: {e}")
 
@@ -250,7 +370,7 @@ def train_models(cfg_path: str, xlsx_path: str, bump_type: str = "minor", notes:
     # Save metadata
     try:
         metadata_path = models_dir / "metadata.yaml"
-        if not str(metadata_path.resolve()).startswith(str(models_dir.resolve())):
+        if not str(metadata_path.resolve()).startswith(models_dir_resolved):
             raise ValueError("Invalid metadata path")
         save_metadata(metadata_path, meta)
     except Exception as e:
@@ -7,14 +7,20 @@ Utility functions for:
 """
 
 import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 
+import matplotlib
+matplotlib.use("Agg")  # plots are only saved to disk; skip GUI backend detection
 import matplotlib.pyplot as plt
 import yaml
-from packaging import version
 from sklearn.metrics import confusion_matrix, ConfusionMatrixDisplay, accuracy_score, f1_score
 
+# libyaml's C loader/dumper when PyYAML was built with it, else the pure-Python safe ones
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 def bump_model_version(metadata_path: Path, bump_type: str = "minor") -> str:
     """Increment semantic version number for new training runs."""
@@ -22,16 +28,18 @@ def bump_model_version(metadata_path: Path, bump_type: str = "minor") -> str:
         return "1.0.0"
 
     with open(metadata_path, "r") as f:
-        meta = yaml.safe_load(f)
+        meta = yaml.load(f, Loader=YAML_LOADER)
 
-    current = version.parse(meta.get("version", "1.0.0"))
+    # Versions are always plain MAJOR.MINOR.PATCH; missing parts count as 0
+    parts = (str(meta.get("version", "1.0.0")).split(".") + ["0", "0"])[:3]
+    major, minor, patch = map(int, parts)
 
     if bump_type == "major":
-        new_ver = f"{current.major + 1}.0.0"
+        new_ver = f"{major + 1}.0.0"
     elif bump_type == "minor":
-        new_ver = f"{current.major}.{current.minor + 1}.0"
+        new_ver = f"{major}.{minor + 1}.0"
     else:
-        new_ver = f"{current.major}.{current.minor}.{current.micro + 1}"
+        new_ver = f"{major}.{minor}.{patch + 1}"
 
     return new_ver
 
@@ -46,18 +54,26 @@ def evaluate_and_plot(y_true, y_pred, label: str, output_dir: Path, version_str:
     disp.plot(cmap="Blues")
     output_dir.mkdir(parents=True, exist_ok=True)
     plot_path = output_dir / f"confusion_matrix_{label}_v{version_str}.png"
-    plt.savefig(plot_path, bbox_inches="tight")
-    plt.close()
+    disp.figure_.savefig(plot_path, bbox_inches="tight")
+    plt.close(disp.figure_)
 
     return acc, f1, str(plot_path)
 
 
 def save_metadata(metadata_path: Path, data: dict):
-    """Write metadata.yaml and archive previous one in history/."""
+    """Write metadata.yaml and archive previous one in history/.
+
+    The new file is written and fsynced next to the old one and then swapped in with
+    os.replace, so a crash mid-write never leaves metadata.yaml missing or truncated.
+    """
     os.makedirs(metadata_path.parent / "history", exist_ok=True)
+    tmp_path = metadata_path.with_suffix(".yaml.tmp")
+    with open(tmp_path, "w") as f:
+        yaml.dump(data, f, Dumper=YAML_DUMPER, sort_keys=False)
+        f.flush()
+        os.fsync(f.fileno())
     if metadata_path.exists():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         archived = metadata_path.parent / "history" / f"metadata_{timestamp}.yaml"
-        os.rename(metadata_path, archived)
-    with open(metadata_path, "w") as f:
-        yaml.safe_dump(data, f, sort_keys=False)
\ No newline at end of file
+        shutil.copy2(metadata_path, archived)
+    os.replace(tmp_path, metadata_path)
\ No newline at end of file
@@ -91,6 +91,7 @@ def _setup_ingest_parser(subparsers):
     ingest_parser.add_argument('--workspace', metavar='PATH', help='Finance workspace folder containing workbook (interactive mode only)')
     ingest_parser.add_argument('--workbook', metavar='FILENAME', help='Finance workbook filename (interactive mode only)')
     ingest_parser.add_argument('--inputs', metavar='PATH', help='Inputs folder containing bank CSV files (interactive mode only)')
+    ingest_parser.add_argument('--verbose', '-v', action='store_true', help='Show per-file processing diagnostics (debug logging)')
     
     return ingest_parser
 
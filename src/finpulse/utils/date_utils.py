@@ -2,7 +2,7 @@
 
 import logging
 import re
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Optional
 
 import pandas as pd
@@ -13,30 +13,35 @@ MMDD_PATTERN = re.compile(r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b")
 ISO_PATTERN = re.compile(r"\b\d{4}-\d{1,2}-\d{1,2}\b")
 MONTH_PATTERN = re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b", re.IGNORECASE)
 DATE_SEARCH_PATTERN = re.compile(r"date", re.IGNORECASE)
+# Single alternation of the three above so date_like_ratio scans each string once
+DATE_LIKE_PATTERN = re.compile(
+    "|".join(f"(?:{p.pattern})" for p in (MMDD_PATTERN, ISO_PATTERN, MONTH_PATTERN)), re.IGNORECASE
+)
 DATE_EXTRACT_PATTERNS = [
     (re.compile(r"(\d{1,2}/\d{1,2}/\d{4})"), "%m/%d/%Y"),
     (re.compile(r"(\d{1,2}/\d{1,2}/\d{2})"), "%m/%d/%y"),
     (re.compile(r"(\d{4}-\d{1,2}-\d{1,2})"), None)
 ]
+TRAILING_YEAR4_PATTERN = re.compile(r"/(\d{2})(\d{2})$")
 
 
 def date_like_ratio(series: pd.Series) -> float:
     """Calculate ratio of date-like values in a pandas Series."""
     s = series.astype(str).fillna("")
-    mmdd = s.str.contains(MMDD_PATTERN, na=False)
-    iso = s.str.contains(ISO_PATTERN, na=False)
-    monthwrd = s.str.contains(MONTH_PATTERN, na=False)
-    return float((mmdd | iso | monthwrd).mean())
+    return float(s.str.contains(DATE_LIKE_PATTERN, na=False).mean())
 
 
 def robust_parse_dates(series: pd.Series, date_format: Optional[str]) -> pd.Series:
     """Parse dates with multiple fallback formats."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Already parsed by the reader (fast_io)
+        return series
     s = series.astype(str).str.strip()
     if date_format:
         try:
             # Smart year truncation: convert 4-digit years to 2-digit for %y format
             if "%y" in date_format and "%Y" not in date_format:
-                s = s.str.replace(r"/(\d{2})(\d{2})$", r"/\2", regex=True)
+                s = s.str.replace(TRAILING_YEAR4_PATTERN, r"/\2", regex=True)
             return pd.to_datetime(s, errors="coerce", format=date_format)
         except (ValueError, TypeError) as e:
             logging.warning(f"Failed to parse dates with format {date_format}: {e}")
@@ -48,14 +53,14 @@ def robust_parse_dates(series: pd.Series, date_format: Optional[str]) -> pd.Seri
         logging.warning(f"Failed to parse dates: {e}")
         return pd.Series([pd.NaT] * len(s))
     
-    # Use cached patterns for better performance
+    # Use cached patterns, and only extract from the rows still unparsed after earlier passes.
+    # Exports repeat the same strings a lot, so each distinct one is parsed once.
     for pattern, fmt in DATE_EXTRACT_PATTERNS:
-        if dt.isna().mean() > 0.25:
-            extracted = s.str.extract(pattern, expand=False)
-            if fmt:
-                dt = dt.fillna(pd.to_datetime(extracted, errors="coerce", format=fmt))
-            else:
-                dt = dt.fillna(pd.to_datetime(extracted, errors="coerce"))
+        missing = dt.isna().to_numpy()
+        if missing.sum() > 0.25 * len(missing):
+            codes, uniques = pd.factorize(s[missing], use_na_sentinel=False)
+            extracted = pd.Series(uniques, dtype=object).str.extract(pattern, expand=False)
+            dt[missing] = pd.to_datetime(extracted, errors="coerce", format=fmt).to_numpy()[codes]
     return dt
 
 
@@ -63,6 +68,9 @@ def try_coerce_excel_date(value: Any) -> Any:
     """Try to coerce a value to an Excel-compatible date."""
     if value is None:
         return None
+    if isinstance(value, date):
+        # date/datetime/Timestamp values come back unchanged, so skip the strptime attempts
+        return value
     s = str(value).strip()
     for fmt in ("%m/%d/%y", "%m/%d/%Y", "%Y-%m-%d", "%m-%d-%y", "%m-%d-%Y"):
         try:
@@ -2,59 +2,160 @@
 
 import io
 import logging
-from datetime import datetime
+import os
+import threading
+import time
+import weakref
+
+
+LOG_FILE_BUFFER_SIZE = 1 << 20
+LOG_FLUSH_INTERVAL = 1.0  # seconds between background flushes of a Tee'd log file
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def _is_interactive(stream) -> bool:
+    """Return True if stream is attached to a terminal."""
+    try:
+        return stream.isatty()
+    except (AttributeError, OSError, ValueError):
+        return False
 
 
 class Tee(io.TextIOBase):
     """Write to multiple streams simultaneously."""
     
-    def __init__(self, *streams):
+    def __init__(self, *streams, flush_interval: float = None):
         self.streams = list(streams)
-        self._closed = set()
+        self._closed = set()  # ids of failed/closed streams awaiting removal from .streams
+        self._dirty = set()  # ids of streams written since their last flush
         self._is_closed = False
+        # Serializes writes from worker threads (e.g. K-fold log records); reentrant so a
+        # stream that itself logs back into the Tee can't deadlock it
+        self._lock = threading.RLock()
+        # Only interactive streams are flushed per write; files keep their own buffering, and
+        # line-buffered terminals already write out each completed line on their own
+        self._autoflush = {id(st) for st in streams
+                           if _is_interactive(st) and not getattr(st, "line_buffering", False)}
+        # Probe once which streams expose .closed instead of hasattr() on every write
+        self._closable = {id(st) for st in streams if hasattr(st, 'closed')}
+        # With flush_interval, a daemon thread flushes buffered streams periodically so the
+        # log file stays current without writers ever paying for the write syscall
+        self._flush_interval = flush_interval
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        self._start_flusher()
+        _live_tees.add(self)
+    
+    def _start_flusher(self):
+        if self._flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, args=(self._flush_interval,),
+                                             name="tee-flusher", daemon=True)
+            self._flusher.start()
+    
+    def _before_fork(self):
+        """Hold the lock across fork() with buffers flushed, so the child inherits neither a
+        lock taken by another thread nor log data the parent will also write out.
+        """
+        self._lock.acquire()
+        for st in self.streams:
+            if id(st) in self._dirty and id(st) not in self._closed:
+                try:
+                    st.flush()
+                except (OSError, IOError, ValueError):
+                    self._closed.add(id(st))
+        self._dirty.clear()
+    
+    def _after_fork_in_parent(self):
+        self._lock.release()
+    
+    def _after_fork_in_child(self):
+        """Give the child a fresh lock and its own flusher; threads do not survive fork()."""
+        self._lock = threading.RLock()
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        if not self._is_closed:
+            self._start_flusher()
+    
+    @classmethod
+    def from_path(cls, path, *streams, buffer_size: int = LOG_FILE_BUFFER_SIZE,
+                  flush_interval: float = LOG_FLUSH_INTERVAL):
+        """Tee streams into a new UTF-8 log file at path, block-buffered with buffer_size bytes.
+
+        The file is the last of .streams and is flushed in the background every
+        flush_interval seconds; the caller closes it after closing the Tee.
+        """
+        log_fp = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        return cls(*streams, log_fp, flush_interval=flush_interval)
+    
+    def _flush_loop(self, interval: float):
+        """Flush every interval seconds until close()."""
+        while not self._stop_flusher.wait(interval):
+            self.flush()
     
     def write(self, s):
         if self._is_closed:
             return len(s)
         
-        for st in list(self.streams):
-            try:
-                if hasattr(st, 'closed') and st.closed:
-                    self._closed.add(st)
+        with self._lock:
+            # Failed streams are only marked here and skipped; .streams is rebuilt lazily
+            for st in self.streams:
+                if id(st) in self._closed:
                     continue
-                st.write(s)
-                st.flush()
-            except (OSError, IOError, ValueError) as e:
-                # Silently remove failed streams to prevent spam
-                self._closed.add(st)
-        
-        if self._closed:
-            self.streams = [st for st in self.streams if st not in self._closed]
-            self._closed.clear()
+                try:
+                    if id(st) in self._closable and st.closed:
+                        self._closed.add(id(st))
+                        continue
+                    st.write(s)
+                    if id(st) in self._autoflush:
+                        st.flush()
+                    else:
+                        self._dirty.add(id(st))
+                except (OSError, IOError, ValueError) as e:
+                    # Silently remove failed streams to prevent spam
+                    self._closed.add(id(st))
+            
+            if len(self._closed) > len(self.streams) // 2:
+                self._prune_closed()
         return len(s)
     
+    def _prune_closed(self):
+        """Drop the streams marked in _closed from .streams (caller holds _lock)."""
+        self.streams = [st for st in self.streams if id(st) not in self._closed]
+        self._dirty -= self._closed
+        self._closed.clear()
+    
     def flush(self):
         if self._is_closed:
             return
             
-        for st in list(self.streams):
-            try:
-                if hasattr(st, 'closed') and st.closed:
-                    self._closed.add(st)
+        with self._lock:
+            # Streams with nothing written since their last flush have nothing to push out
+            for st in self.streams:
+                if id(st) not in self._dirty or id(st) in self._closed:
                     continue
-                st.flush()
-            except (OSError, IOError, ValueError) as e:
-                # Silently remove failed streams
-                self._closed.add(st)
-        
-        if self._closed:
-            self.streams = [st for st in self.streams if st not in self._closed]
-            self._closed.clear()
+                try:
+                    if id(st) in self._closable and st.closed:
+                        self._closed.add(id(st))
+                        continue
+                    st.flush()
+                except (OSError, IOError, ValueError) as e:
+                    # Silently remove failed streams
+                    self._closed.add(id(st))
+            self._dirty.clear()
+            
+            if self._closed:
+                self._prune_closed()
     
     def close(self):
         """Close the Tee and mark it as closed."""
-        self._is_closed = True
-        self.streams.clear()
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            self._is_closed = True
+            self.streams.clear()
+            self._closed.clear()
+            self._dirty.clear()
     
     @property
     def closed(self):
@@ -62,15 +163,39 @@ class Tee(io.TextIOBase):
         return self._is_closed
 
 
+# Tees alive in this process, kept consistent across fork() (e.g. ProcessPoolExecutor workers)
+_live_tees = weakref.WeakSet()
+
+
+def _fork_hook(name: str):
+    def hook():
+        for tee in list(_live_tees):
+            getattr(tee, name)()
+    return hook
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_fork_hook("_before_fork"),
+                        after_in_parent=_fork_hook("_after_fork_in_parent"),
+                        after_in_child=_fork_hook("_after_fork_in_child"))
+
+
 def utc_log_name(is_dry: bool) -> str:
     """Generate local timestamp-based log filename."""
-    ts = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+    ts = time.strftime("%Y-%m-%dT%H-%M-%S", time.localtime())
     return f"Log {ts}{' dry-run' if is_dry else ''}.txt"
 
 
-def setup_logging() -> None:
-    """Configure basic logging."""
+def setup_logging(verbose: bool = False) -> None:
+    """Configure basic logging; verbose enables per-file debug diagnostics."""
     logging.basicConfig(
-        level=logging.INFO, 
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
\ No newline at end of file
+        level=logging.DEBUG if verbose else logging.INFO, 
+        format=LOG_FORMAT
+    )
+
+
+def route_root_log_stream(stream) -> None:
+    """Point the root logger's console handlers at stream (e.g. a Tee)."""
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(stream)
\ No newline at end of file
@@ -1,21 +1,41 @@
 """Path validation and utilities."""
 
+import errno
+import functools
 import logging
+import os
 import shutil
 import time
-from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 
+@functools.lru_cache(maxsize=1024)
+def _resolve(path_str: str, cwd: str) -> Path:
+    """Resolve path_str; cached because resolve() stats every path component.
+
+    cwd is part of the key so relative paths are not reused across directory changes.
+    Entries are never revalidated: a symlink retargeted after its first lookup keeps
+    resolving to the old target until clear_path_cache() is called. The paths seen
+    here (config, workbook, input folders) are fixed for the length of a run.
+    """
+    return Path(path_str).resolve(strict=False)
+
+
+def _resolve_cached(path: Path) -> Path:
+    """Resolve path through the _resolve cache."""
+    return _resolve(str(path), "" if path.is_absolute() else os.getcwd())
+
+
 def validate_path(path: Path, allowed_base: Optional[Path] = None) -> Path:
     """Validate and resolve path, optionally checking it's within allowed base directory."""
     try:
-        resolved = path.resolve(strict=False)
+        resolved = _resolve_cached(path)
         if allowed_base:
             try:
-                allowed_resolved = allowed_base.resolve(strict=False)
-                if not str(resolved).startswith(str(allowed_resolved)):
+                allowed_resolved = _resolve_cached(allowed_base)
+                # Compare path parts, so a sibling like /base2 is not mistaken for inside /base
+                if not resolved.is_relative_to(allowed_resolved):
                     raise ValueError(f"Path {path} is outside allowed directory {allowed_base}")
             except (OSError, RuntimeError) as e:
                 raise ValueError(f"Cannot resolve allowed base path {allowed_base}: {e}")
@@ -24,6 +44,11 @@ def validate_path(path: Path, allowed_base: Optional[Path] = None) -> Path:
         raise ValueError(f"Invalid path {path}: {e}")
 
 
+def clear_path_cache() -> None:
+    """Forget cached resolutions, e.g. after symlinks or the working tree changed on disk."""
+    _resolve.cache_clear()
+
+
 def get_timestamp(p: Path) -> str:
     """Get formatted timestamp for a file."""
     try:
@@ -33,13 +58,45 @@ def get_timestamp(p: Path) -> str:
         return "n/a"
 
 
+# copy_file_range errors meaning "not supported here"; anything else is a real failure
+_COPY_RANGE_UNSUPPORTED = frozenset({errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP})
+
+
+def _copy_file_data(src: Path, dst: Path) -> None:
+    """Copy file contents inside the kernel with copy_file_range (a reflink on CoW filesystems).
+
+    Falls back to shutil.copyfile (sendfile on Linux) where copy_file_range is unavailable
+    or stops short of the source size: some filesystems (e.g. procfs, certain FUSE mounts)
+    report 0 bytes copied instead of an error, and a file that changes size mid-copy would
+    otherwise leave a truncated copy.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+                remaining = os.fstat(in_fd).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(in_fd, out_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError as e:
+            if e.errno not in _COPY_RANGE_UNSUPPORTED:
+                raise
+    # copyfile reopens dst for writing, replacing any partial copy
+    shutil.copyfile(src, dst)
+
+
 def create_timestamped_copy(original_path: Path) -> Path:
     """Create a timestamped copy of the original file."""
     if not original_path.exists():
         raise FileNotFoundError(f"Original file does not exist: {original_path}")
     
     # Generate ISO 8601 timestamp with local timezone, replacing colons with hyphens for filename compatibility
-    timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S.%f")[:-3]  # Remove last 3 digits from microseconds
+    seconds, ns = divmod(time.time_ns(), 1_000_000_000)
+    timestamp = f"{time.strftime('%Y-%m-%dT%H-%M-%S', time.localtime(seconds))}.{ns // 1_000_000:03d}"
     
     # Create new filename: <original_name> <timestamp>.<extension>
     stem = original_path.stem
@@ -48,7 +105,8 @@ def create_timestamped_copy(original_path: Path) -> Path:
     copy_path = original_path.parent / new_name
     
     try:
-        shutil.copy2(original_path, copy_path)
+        _copy_file_data(original_path, copy_path)
+        shutil.copystat(original_path, copy_path)
         logging.info(f"Created timestamped copy: {copy_path}")
         return copy_path
     except (OSError, PermissionError) as e: